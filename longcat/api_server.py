@@ -5,7 +5,7 @@ Provides REST API for LongCat Avatar video generation with Redis job tracking
 
 import os
 import sys
-import json
+import orjson
 import uuid
 import asyncio
 from pathlib import Path
@@ -162,7 +162,7 @@ async def save_job_status(job_id: str, status: JobStatus, **kwargs):
             "updated_at": datetime.utcnow().isoformat(),
             **kwargs
         }
-        await r.setex(f"job:{job_id}", 86400, json.dumps(job_data))  # 24 hour TTL
+        await r.setex(f"job:{job_id}", 86400, orjson.dumps(job_data).decode())  # 24 hour TTL
         logger.info(f"Job {job_id} status updated: {status.value}")
     except Exception as e:
         logger.error(f"Failed to save job status: {e}")
@@ -174,7 +174,7 @@ async def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
         r = await get_redis()
         data = await r.get(f"job:{job_id}")
         if data:
-            return json.loads(data)
+            return orjson.loads(data)
         return None
     except Exception as e:
         logger.error(f"Failed to get job status: {e}")
@@ -189,7 +189,7 @@ async def update_job_progress(job_id: str, progress: float):
         if job_data:
             job_data["progress"] = progress
             job_data["updated_at"] = datetime.utcnow().isoformat()
-            await r.setex(f"job:{job_id}", 86400, json.dumps(job_data))
+            await r.setex(f"job:{job_id}", 86400, orjson.dumps(job_data).decode())
     except Exception as e:
         logger.error(f"Failed to update progress: {e}")
 
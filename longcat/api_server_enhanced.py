@@ -5,7 +5,7 @@ Integrates with actual LongCat inference for real video generation
 
 import os
 import sys
-import json
+import orjson
 import uuid
 import asyncio
 import subprocess
@@ -144,8 +144,8 @@ async def generate_avatar_video(
             }
         }
         
-        with open(input_json_path, 'w') as f:
-            json.dump(input_config, f, indent=2)
+        with open(input_json_path, 'wb') as f:
+            f.write(orjson.dumps(input_config, option=orjson.OPT_INDENT_2))
         
         update_job_status(job_id, JobStatus.PROCESSING, progress=30.0)
         
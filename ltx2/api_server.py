@@ -5,23 +5,39 @@ Fast, unified audio-video generation with LTX-2
 
 import os
 import sys
-import json
-import uuid
 import asyncio
+import hashlib
+import time
+from functools import lru_cache
+import sqlite3
 import subprocess
 import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
-from fastapi.responses import FileResponse
+import aiofiles
+from cachetools import TTLCache
+import orjson
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import uvicorn
 from loguru import logger
 
+# Optional Redis backing for job state (multi-worker deploys)
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+import pipeline_worker
+
 # Configure logging
 logger.remove()
 logger.add(sys.stdout, level=os.getenv("LOG_LEVEL", "INFO"))
@@ -32,7 +48,8 @@ app = FastAPI(
     description="AI-powered text-to-video avatar generation with unified audio-video",
     version="3.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -54,12 +71,107 @@ DISTILLED_LORA = os.getenv("DISTILLED_LORA", f"{LTX2_DIR}/models/ltx-2-19b-disti
 OUTPUT_PATH = Path(os.getenv("OUTPUT_PATH", str(BASE_DIR / "outputs")))
 TEMP_PATH = BASE_DIR / "temp"
 
+# Hoisted Path constants - rebuilt nowhere per-request
+_LTX2_PATH = Path(LTX2_DIR)
+_REF_FOLDER_NAMES = ("natasha_refs", "natasha_single", "avatar_clean", "reference_images", "refs")
+_REF_FOLDERS = [_LTX2_PATH / name for name in _REF_FOLDER_NAMES]
+
+# When set (e.g. "/internal/outputs"), downloads return an
+# X-Accel-Redirect so a fronting nginx serves the file via kernel
+# sendfile instead of proxying bytes through Python
+NGINX_ACCEL_PREFIX = os.getenv("NGINX_ACCEL_PREFIX")
+
 # Ensure directories exist
 OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
 TEMP_PATH.mkdir(parents=True, exist_ok=True)
 
-# Job tracking (in-memory)
-jobs_db: Dict[str, Dict[str, Any]] = {}
+# Job tracking (in-memory, bounded) - entries expire after 24h and the
+# oldest are evicted past 10k jobs, so the map can't grow without limit
+JOB_TTL_SECONDS = 86400
+jobs_db: TTLCache = TTLCache(maxsize=10_000, ttl=JOB_TTL_SECONDS)
+
+# Content hash -> job_id for deduplicating identical submissions (the
+# seed is fixed, so identical inputs produce byte-identical videos)
+_hash_to_job: TTLCache = TTLCache(maxsize=10_000, ttl=JOB_TTL_SECONDS)
+
+# With REDIS_URL set (and redis installed), every job update is mirrored
+# to Redis with the same TTL and published on progress:{job_id}, so
+# multiple uvicorn workers see each other's jobs. The local cache stays
+# authoritative for the worker that owns the job.
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = aioredis.from_url(REDIS_URL, decode_responses=True) if (aioredis and REDIS_URL) else None
+
+# Running event loop, captured at startup (it also owns the sized
+# default executor installed there)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Prompt templates, built once - build_prompt only fills the variable
+# fields instead of rebuilding the boilerplate per request
+PROMPT_TEMPLATES = {
+    "random": (
+        "Photorealistic video: {details}. Speaking fluently in {language}, saying: '{text}' "
+        "Clear pronunciation, engaging eye contact, natural expressions, cinematic lighting, "
+        "high quality 4K detail, modern setting."
+    ),
+    "image": (
+        "A professional person speaking fluently in {language}. They say: '{text}' "
+        "Clear pronunciation, engaging eye contact, natural gestures, modern setting, "
+        "professional appearance."
+    ),
+    "default": (
+        "A professional person speaking fluently in {language}. They say: '{text}' "
+        "Clear articulation, warm smile, modern office background, natural lighting, "
+        "confident expression."
+    )
+}
+
+# Upload limits checked before any bytes hit disk
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+# Generation queue - a single worker task drains it, packing compatible
+# text-only jobs into one pipeline forward pass when the resident
+# pipeline is loaded
+generation_queue: asyncio.Queue = asyncio.Queue()
+MAX_BATCH_SIZE = int(os.getenv("LTX2_MAX_BATCH", "4"))
+
+# LTX-2 emits thousands of stdout lines per generation - batch them into
+# chunks so each line doesn't pay formatting + a sink write/lock
+LTX2_LOG_BATCH_SIZE = 50
+
+# Keyword -> progress pct for the stock LTX-2 log format (first match wins)
+PROGRESS_KEYWORDS = [
+    ("Loading", 40.0),
+    ("Generating", 60.0),
+    ("Stage 1", 60.0),
+    ("Stage 2", 80.0),
+    ("Upscaling", 80.0)
+]
+
+# Latest training log, cached against the log directory's mtime - the
+# atomic os.replace writes bump the directory mtime, so a single stat
+# tells us whether a rescan is needed
+_training_log_cache = {"dir_mtime": -1.0, "data": None}
+
+
+def _job_id_gen():
+    """Yield 32-char hex job IDs from a pooled os.urandom buffer
+
+    One 16 KiB urandom read covers 1024 job IDs, instead of one syscall
+    plus hyphenated string formatting per uuid4() call
+    """
+    buf = b""
+    pos = 0
+    while True:
+        if pos >= len(buf):
+            buf = os.urandom(16 * 1024)
+            pos = 0
+        yield buf[pos:pos + 16].hex()
+        pos += 16
+
+
+_job_ids = _job_id_gen()
 
 
 # ============================================
@@ -92,22 +204,466 @@ class StatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+class BatchGenerateItem(BaseModel):
+    """One text-only generation request inside a /generate-batch call"""
+    text: str
+    language: str = "English"
+    duration: int = Field(20, ge=5, le=30)
+    playback_speed: float = 1.25
+    random_avatar: bool = False
+    avatar_description: str = "A friendly professional"
+    avatar_gender: str = "Any"
+    avatar_age: str = "Any"
+    avatar_ethnicity: str = "Any"
+    avatar_style: str = "Professional"
+
+
 # ============================================
 # Helper Functions
 # ============================================
 
+def _save_upload(fileobj, dest_path: str):
+    """Copy an uploaded file to disk through one reusable 1 MiB buffer
+
+    Runs in a worker thread (asyncio.to_thread) so the event loop never
+    blocks on disk writes. readinto() + memoryview slices reuse the same
+    buffer for every chunk instead of allocating a fresh bytes object
+    per read
+    """
+    buf = bytearray(1 << 20)
+    mv = memoryview(buf)
+    fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        readinto = getattr(fileobj, "readinto", None)
+        if readinto is not None:
+            while n := readinto(buf):
+                os.write(fd, mv[:n])
+        else:
+            # SpooledTemporaryFile grows readinto only on Python 3.11+
+            while chunk := fileobj.read(1 << 20):
+                os.write(fd, chunk)
+    finally:
+        os.close(fd)
+
+
+async def _stream_upload(upload: UploadFile, dest_path: Path):
+    """Stream an UploadFile to disk in 1 MiB chunks
+
+    Keeps peak memory at one chunk instead of the whole payload, and
+    writes through aiofiles so the event loop never blocks on disk
+    """
+    async with aiofiles.open(dest_path, "wb") as f:
+        while chunk := await upload.read(1 << 20):
+            await f.write(chunk)
+
+
+async def _load_job(job_id: str) -> Optional[dict]:
+    """Fetch a job record: local cache first, then the shared store
+
+    Under multiple uvicorn workers each process sees only its own jobs
+    locally; the Redis mirror makes every worker's jobs visible to all
+    """
+    job = jobs_db.get(job_id)
+    if job is None and redis_client is not None:
+        try:
+            record = await redis_client.get(f"job:{job_id}")
+            if record:
+                job = orjson.loads(record)
+        except Exception as e:
+            logger.warning(f"Redis lookup failed for job {job_id}: {e}")
+    return job
+
+
+# Model paths never vanish mid-run, so a positive existence probe is
+# cached forever; a negative one re-checks on a TTL (the models may
+# still be downloading right after boot)
+_PATH_PROBE_TTL = 15.0
+_path_probe_cache: dict = {}
+
+
+def _path_available(path_str: str) -> bool:
+    """stat-free existence check for the /health hot path"""
+    cached = _path_probe_cache.get(path_str)
+    now = time.monotonic()
+    if cached is not None:
+        found, checked_at = cached
+        if found or now - checked_at < _PATH_PROBE_TTL:
+            return found
+    found = Path(path_str).exists()
+    _path_probe_cache[path_str] = (found, now)
+    return found
+
+
+def align_num_frames(num_frames: int) -> int:
+    """Round to the nearest 8n+1 frame count
+
+    The VAE compresses time in blocks of 8 frames (plus the leading
+    frame); misaligned counts get padded and re-cropped, wasting steps
+    """
+    return 8 * round((num_frames - 1) / 8) + 1
+
+
+def compute_job_hash(
+    prompt: str,
+    seed: int,
+    resolution: str,
+    num_frames: int,
+    image_path: Optional[str],
+    image_strength: float,
+    playback_speed: float,
+    fresh_start_mode: bool
+) -> str:
+    """Content-address a job: every input that affects the output bytes
+
+    BLAKE2 runs at GB/s per core, so hashing even a large reference image
+    is negligible next to a generation
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{prompt}|{seed}|{resolution}|{num_frames}|{image_strength}|{playback_speed}|{fresh_start_mode}".encode())
+    if image_path:
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _link_or_copy(src: Path, dest: Path):
+    """Hardlink a finished video to a new job_id; copy if linking fails"""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def read_json(path: Path) -> dict:
+    """Load a JSON file through orjson"""
+    return orjson.loads(path.read_bytes())
+
+
+def atomic_write_json(path: Path, data: dict):
+    """Write JSON via temp file + os.replace so readers never see torn writes"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+
+
+# Training-run index: the JSON logs on disk stay the source of truth
+# (and keep /training-progress reads working), but "latest run" lookups
+# hit a tiny indexed SQLite table instead of statting every log file
+_TRAINING_DB_PATH = BASE_DIR / "outputs" / "training_logs" / "index.db"
+_training_db_conn = None
+_training_db_lock = threading.Lock()
+
+
+def _training_db():
+    """Lazily open the training-run index, creating the schema once"""
+    global _training_db_conn
+    if _training_db_conn is None:
+        _TRAINING_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(_TRAINING_DB_PATH, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS training_runs ("
+            "person TEXT PRIMARY KEY, json TEXT NOT NULL, mtime REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_mtime ON training_runs (mtime DESC)")
+        conn.commit()
+        _training_db_conn = conn
+    return _training_db_conn
+
+
+def write_training_log(path: Path, data: dict):
+    """Persist a training log: atomic JSON write plus an upsert into
+    the SQLite latest-run index"""
+    atomic_write_json(path, data)
+    try:
+        with _training_db_lock:
+            conn = _training_db()
+            conn.execute(
+                "INSERT INTO training_runs (person, json, mtime) VALUES (?, ?, ?) "
+                "ON CONFLICT(person) DO UPDATE SET json=excluded.json, mtime=excluded.mtime",
+                (data.get("person_name", path.stem), orjson.dumps(data).decode(), time.time())
+            )
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Training index update failed: {e}")
+
+
+def _safe_delete(path: Path, label: str) -> str:
+    """Delete a file or folder tree; returns the report line for the caller
+
+    Runs in worker threads so several deletions proceed concurrently
+    without pinning the event loop
+    """
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+    return f"Removed {label}: {path.name}"
+
+
+# Write-behind mirroring: updates land in jobs_db instantly and only
+# mark the job dirty; a flusher task pushes dirty records to Redis in
+# one pipeline per interval instead of a round-trip per update
+_dirty_jobs: set = set()
+_FLUSH_INTERVAL = 0.5
+
+
 def update_job_status(job_id: str, status: JobStatus, **kwargs):
-    """Update job status in memory"""
+    """Update job status in memory (and mirror to Redis when configured)
+
+    TTLCache is not thread-safe, so calls arriving off the event loop
+    (pipeline progress callbacks running under asyncio.to_thread) are
+    marshalled onto the loop instead of mutating jobs_db directly
+    """
+    if _loop is not None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _loop.call_soon_threadsafe(
+                _apply_job_update, job_id, status, kwargs
+            )
+            return
+    _apply_job_update(job_id, status, kwargs)
+
+
+def _apply_job_update(job_id: str, status: JobStatus, fields: dict):
+    """Mutate jobs_db; must run on the event-loop thread"""
     if job_id not in jobs_db:
         jobs_db[job_id] = {"job_id": job_id}
-    
+
     jobs_db[job_id].update({
         "status": status.value,
         "updated_at": datetime.utcnow().isoformat(),
-        **kwargs
+        **fields
     })
     logger.info(f"Job {job_id} status: {status.value}")
 
+    if redis_client is not None:
+        _dirty_jobs.add(job_id)
+
+
+async def _flush_dirty_jobs():
+    """Push all dirty job records to Redis in one pipeline"""
+    if not _dirty_jobs or redis_client is None:
+        return
+    batch = [(job_id, jobs_db.get(job_id)) for job_id in list(_dirty_jobs)]
+    _dirty_jobs.difference_update(job_id for job_id, _ in batch)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for job_id, job in batch:
+            if job is None:
+                continue
+            record = orjson.dumps(job).decode()
+            pipe.set(f"job:{job_id}", record, ex=JOB_TTL_SECONDS)
+            pipe.publish(f"progress:{job_id}", record)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis flush failed for {len(batch)} job(s): {e}")
+
+
+async def _job_flusher():
+    """Flush dirty job records every _FLUSH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(_FLUSH_INTERVAL)
+        await _flush_dirty_jobs()
+
+
+def build_prompt(
+    text: str,
+    language: str,
+    image_path: Optional[str],
+    random_avatar: bool,
+    avatar_description: str,
+    avatar_gender: str,
+    avatar_age: str,
+    avatar_ethnicity: str,
+    avatar_style: str
+) -> str:
+    """Build the LTX-2 prompt for one job (shared by single and batched paths)"""
+    if random_avatar:
+        # Build comprehensive avatar description combining user input with selectors
+        characteristics = []
+
+        # Add user description (primary)
+        if avatar_description and avatar_description.strip():
+            characteristics.append(avatar_description.strip())
+
+        # Add optional selectors if specified
+        if avatar_gender != "Any":
+            characteristics.append(f"{avatar_gender.lower()} person")
+        if avatar_age != "Any":
+            characteristics.append(f"age {avatar_age.lower()}")
+        if avatar_ethnicity != "Any":
+            characteristics.append(f"{avatar_ethnicity} ethnicity")
+        if avatar_style != "Professional":
+            characteristics.append(f"{avatar_style.lower()} style")
+
+        # Combine all characteristics
+        avatar_details = ", ".join(characteristics) if characteristics else "A professional person"
+
+        prompt = PROMPT_TEMPLATES["random"].format(details=avatar_details, language=language, text=text)
+        logger.info(f"Random avatar prompt: {prompt}")
+    elif image_path:
+        prompt = PROMPT_TEMPLATES["image"].format(language=language, text=text)
+    else:
+        prompt = PROMPT_TEMPLATES["default"].format(language=language, text=text)
+
+    return prompt
+
+
+def finalize_generated_video(
+    job_id: str,
+    output_video_path: Path,
+    playback_speed: float,
+    image_path: Optional[str]
+):
+    """Verify, post-process and mark one generated video as completed"""
+    # Verify output exists
+    if not output_video_path.exists():
+        raise FileNotFoundError("LTX-2 did not generate output file")
+
+    logger.info(f"Video saved to {output_video_path}")
+
+    # Apply playback speed if not 1.0
+    if playback_speed != 1.0:
+        logger.info(f"Applying playback speed: {playback_speed}x")
+        temp_output = OUTPUT_PATH / f"{job_id}_temp.mp4"
+
+        # Use ffmpeg to adjust playback speed
+        # setpts adjusts video speed, atempo adjusts audio speed
+        speed_filter = f"setpts={1.0/playback_speed}*PTS"
+        audio_filter = f"atempo={playback_speed}" if playback_speed <= 2.0 else f"atempo=2.0,atempo={playback_speed/2.0}"
+
+        ffmpeg_cmd = [
+            "ffmpeg", "-i", str(output_video_path),
+            "-filter:v", speed_filter,
+            "-filter:a", audio_filter,
+            "-y",  # Overwrite output
+            str(temp_output)
+        ]
+
+        speed_process = subprocess.run(
+            ffmpeg_cmd,
+            capture_output=True,
+            text=True
+        )
+
+        if speed_process.returncode == 0 and temp_output.exists():
+            # Replace original with speed-adjusted version
+            output_video_path.unlink()
+            temp_output.rename(output_video_path)
+            logger.info(f"Playback speed adjusted to {playback_speed}x")
+        else:
+            logger.warning(f"Failed to adjust playback speed: {speed_process.stderr}")
+            # Keep original video if speed adjustment fails
+            if temp_output.exists():
+                temp_output.unlink()
+
+    # Cleanup temp image
+    if image_path and Path(image_path).exists():
+        Path(image_path).unlink(missing_ok=True)
+
+    # Mark as completed
+    update_job_status(
+        job_id,
+        JobStatus.COMPLETED,
+        progress=100.0,
+        video_url=f"/download/{job_id}"
+    )
+
+    logger.info(f"Job {job_id} completed successfully")
+
+
+async def run_ltx2_subprocess(
+    job_id: str,
+    prompt: str,
+    output_video_path: Path,
+    num_frames: int,
+    image_path: Optional[str],
+    image_strength: float
+):
+    """
+    Fallback generation path: shell out to the LTX-2 CLI
+    Used until the resident pipeline finishes loading (or can't load)
+    """
+    # Build LTX-2 command
+    cmd = [
+        "python", "-m", "ltx_pipelines.ti2vid_two_stages",
+        "--checkpoint-path", CHECKPOINT_PATH,
+        "--gemma-root", GEMMA_ROOT,
+        "--spatial-upsampler-path", UPSCALER_PATH,
+        "--distilled-lora", DISTILLED_LORA, "1.0",
+        "--prompt", prompt,
+        "--output-path", str(output_video_path),
+        "--enable-fp8",
+        "--height", "512",
+        "--width", "512",
+        "--num-frames", str(num_frames),
+        "--seed", "42"
+    ]
+
+    # Add image if provided (with configurable strength)
+    if image_path:
+        cmd.extend(["--image", image_path, "0", str(image_strength)])
+
+    logger.info(f"Running LTX-2 command for job {job_id}")
+
+    # Activate venv and run
+    env = os.environ.copy()
+    env["PATH"] = f"{LTX2_DIR}/.venv/bin:{env['PATH']}"
+
+    # Run LTX-2 generation; async pipes keep the event loop responsive
+    # for /status and /health while the subprocess runs
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=LTX2_DIR
+    )
+
+    # Monitor progress (skip log forwarding entirely when INFO is filtered out)
+    forward_logs = logger._core.min_level <= logger.level("INFO").no
+    log_batch = []
+
+    while True:
+        raw = await process.stdout.readline()
+        if not raw:
+            break
+        line = raw.decode("utf-8", "replace")
+        stripped = line.strip()
+
+        if forward_logs:
+            log_batch.append(stripped)
+            if len(log_batch) >= LTX2_LOG_BATCH_SIZE:
+                logger.info("[LTX-2]\n" + "\n".join(log_batch))
+                log_batch.clear()
+
+        # Prefer structured progress events ({"stage": "stage1", "pct": 32.5})
+        # emitted one per line - exact and cheaper than N substring tests
+        if stripped.startswith("{"):
+            try:
+                event = orjson.loads(stripped)
+                if "pct" in event:
+                    update_job_status(job_id, JobStatus.PROCESSING, progress=float(event["pct"]))
+                    continue
+            except (ValueError, TypeError):
+                pass
+
+        # Fall back to keyword sniffing for the stock LTX-2 log format
+        for keyword, pct in PROGRESS_KEYWORDS:
+            if keyword in line:
+                update_job_status(job_id, JobStatus.PROCESSING, progress=pct)
+                break
+
+    if log_batch:
+        logger.info("[LTX-2]\n" + "\n".join(log_batch))
+
+    returncode = await process.wait()
+
+    if returncode != 0:
+        raise RuntimeError(f"LTX-2 process failed with exit code {returncode}")
+
 
 async def generate_avatar_video(
     job_id: str,
@@ -141,148 +697,40 @@ async def generate_avatar_video(
             image_strength = 0.0  # No image conditioning
         
         update_job_status(job_id, JobStatus.PROCESSING, progress=10.0)
-        
+
         # Build prompt with language and text
-        if random_avatar:
-            # Build comprehensive avatar description combining user input with selectors
-            characteristics = []
-            
-            # Add user description (primary)
-            if avatar_description and avatar_description.strip():
-                characteristics.append(avatar_description.strip())
-            
-            # Add optional selectors if specified
-            if avatar_gender != "Any":
-                characteristics.append(f"{avatar_gender.lower()} person")
-            if avatar_age != "Any":
-                characteristics.append(f"age {avatar_age.lower()}")
-            if avatar_ethnicity != "Any":
-                characteristics.append(f"{avatar_ethnicity} ethnicity")
-            if avatar_style != "Professional":
-                characteristics.append(f"{avatar_style.lower()} style")
-            
-            # Combine all characteristics
-            avatar_details = ", ".join(characteristics) if characteristics else "A professional person"
-            
-            prompt = f"Photorealistic video: {avatar_details}. Speaking fluently in {language}, saying: '{text}' Clear pronunciation, engaging eye contact, natural expressions, cinematic lighting, high quality 4K detail, modern setting."
-            logger.info(f"Random avatar prompt: {prompt}")
-        elif image_path:
-            prompt = f"A professional person speaking fluently in {language}. They say: '{text}' Clear pronunciation, engaging eye contact, natural gestures, modern setting, professional appearance."
-        else:
-            prompt = f"A professional person speaking fluently in {language}. They say: '{text}' Clear articulation, warm smile, modern office background, natural lighting, confident expression."
-        
+        prompt = build_prompt(
+            text, language, image_path, random_avatar,
+            avatar_description, avatar_gender, avatar_age,
+            avatar_ethnicity, avatar_style
+        )
+
         output_video_path = OUTPUT_PATH / f"{job_id}.mp4"
         
         update_job_status(job_id, JobStatus.PROCESSING, progress=30.0)
-        
-        # Build LTX-2 command
-        cmd = [
-            "python", "-m", "ltx_pipelines.ti2vid_two_stages",
-            "--checkpoint-path", CHECKPOINT_PATH,
-            "--gemma-root", GEMMA_ROOT,
-            "--spatial-upsampler-path", UPSCALER_PATH,
-            "--distilled-lora", DISTILLED_LORA, "1.0",
-            "--prompt", prompt,
-            "--output-path", str(output_video_path),
-            "--enable-fp8",
-            "--height", "512",
-            "--width", "512",
-            "--num-frames", str(num_frames),
-            "--seed", "42"
-        ]
-        
-        # Add image if provided (with configurable strength)
-        if image_path:
-            cmd.extend(["--image", image_path, "0", str(image_strength)])
-        
-        logger.info(f"Running LTX-2 command for job {job_id}")
-        
-        # Activate venv and run
-        env = os.environ.copy()
-        env["PATH"] = f"{LTX2_DIR}/.venv/bin:{env['PATH']}"
-        
-        # Run LTX-2 generation
-        process = subprocess.Popen(
-            cmd,
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            cwd=LTX2_DIR
-        )
-        
-        # Monitor progress
-        for line in process.stdout:
-            logger.info(f"[LTX-2] {line.strip()}")
-            
-            # Update progress based on logs
-            if "Loading" in line:
-                update_job_status(job_id, JobStatus.PROCESSING, progress=40.0)
-            elif "Generating" in line or "Stage 1" in line:
-                update_job_status(job_id, JobStatus.PROCESSING, progress=60.0)
-            elif "Stage 2" in line or "Upscaling" in line:
-                update_job_status(job_id, JobStatus.PROCESSING, progress=80.0)
-        
-        process.wait()
-        
-        if process.returncode != 0:
-            raise RuntimeError(f"LTX-2 process failed with exit code {process.returncode}")
-        
-        # Verify output exists
-        if not output_video_path.exists():
-            raise FileNotFoundError("LTX-2 did not generate output file")
-        
-        logger.info(f"Video saved to {output_video_path}")
-        
-        # Apply playback speed if not 1.0
-        if playback_speed != 1.0:
-            logger.info(f"Applying playback speed: {playback_speed}x")
-            temp_output = OUTPUT_PATH / f"{job_id}_temp.mp4"
-            
-            # Use ffmpeg to adjust playback speed
-            # setpts adjusts video speed, atempo adjusts audio speed
-            speed_filter = f"setpts={1.0/playback_speed}*PTS"
-            audio_filter = f"atempo={playback_speed}" if playback_speed <= 2.0 else f"atempo=2.0,atempo={playback_speed/2.0}"
-            
-            ffmpeg_cmd = [
-                "ffmpeg", "-i", str(output_video_path),
-                "-filter:v", speed_filter,
-                "-filter:a", audio_filter,
-                "-y",  # Overwrite output
-                str(temp_output)
-            ]
-            
-            speed_process = subprocess.run(
-                ffmpeg_cmd,
-                capture_output=True,
-                text=True
+
+        if pipeline_worker.is_ready():
+            # Fast path: resident pipeline, no model reload / process fork
+            logger.info(f"Running resident-pipeline generation for job {job_id}")
+
+            def on_progress(pct: float):
+                update_job_status(job_id, JobStatus.PROCESSING, progress=pct)
+
+            await asyncio.to_thread(
+                pipeline_worker.generate,
+                prompt=prompt,
+                output_path=str(output_video_path),
+                num_frames=num_frames,
+                seed=42,
+                image_path=image_path,
+                image_strength=image_strength,
+                progress_callback=on_progress
             )
-            
-            if speed_process.returncode == 0 and temp_output.exists():
-                # Replace original with speed-adjusted version
-                output_video_path.unlink()
-                temp_output.rename(output_video_path)
-                logger.info(f"Playback speed adjusted to {playback_speed}x")
-            else:
-                logger.warning(f"Failed to adjust playback speed: {speed_process.stderr}")
-                # Keep original video if speed adjustment fails
-                if temp_output.exists():
-                    temp_output.unlink()
-        
-        # Cleanup temp image
-        if image_path and Path(image_path).exists():
-            Path(image_path).unlink(missing_ok=True)
-        
-        # Mark as completed
-        update_job_status(
-            job_id,
-            JobStatus.COMPLETED,
-            progress=100.0,
-            video_url=f"/download/{job_id}"
-        )
-        
-        logger.info(f"Job {job_id} completed successfully")
-        
+        else:
+            await run_ltx2_subprocess(job_id, prompt, output_video_path, num_frames, image_path, image_strength)
+
+        finalize_generated_video(job_id, output_video_path, playback_speed, image_path)
+
     except Exception as e:
         logger.error(f"Job {job_id} failed: {e}")
         update_job_status(
@@ -292,10 +740,134 @@ async def generate_avatar_video(
         )
 
 
+def _is_batchable(job: dict) -> bool:
+    """Only text-only jobs can be packed into one forward pass -
+    per-job reference images would need per-sample conditioning"""
+    return not job.get("image_path")
+
+
+async def run_generation_batch(jobs: List[dict]):
+    """Run several queued text-only jobs as one packed pipeline forward"""
+    job_ids = [job["job_id"] for job in jobs]
+    try:
+        prompts = []
+        for job in jobs:
+            update_job_status(job["job_id"], JobStatus.PROCESSING, progress=10.0)
+            prompts.append(build_prompt(
+                job["text"], job["language"], None, job["random_avatar"],
+                job["avatar_description"], job["avatar_gender"], job["avatar_age"],
+                job["avatar_ethnicity"], job["avatar_style"]
+            ))
+
+        output_paths = [OUTPUT_PATH / f"{jid}.mp4" for jid in job_ids]
+
+        def on_progress(pct: float):
+            for jid in job_ids:
+                update_job_status(jid, JobStatus.PROCESSING, progress=pct)
+
+        await asyncio.to_thread(
+            pipeline_worker.generate_batch,
+            prompts=prompts,
+            output_paths=[str(p) for p in output_paths],
+            num_frames=jobs[0]["num_frames"],
+            seed=42,
+            progress_callback=on_progress
+        )
+
+        for job, output_path in zip(jobs, output_paths):
+            finalize_generated_video(job["job_id"], output_path, job["playback_speed"], None)
+
+    except Exception as e:
+        # The packed prompt-list call is a contract we don't control -
+        # never fail coalesced jobs on its account. Re-run each one
+        # through the single-job path before giving up on any of them.
+        logger.warning(f"Batch generation failed for jobs {job_ids}, retrying individually: {e}")
+        for job in jobs:
+            await generate_avatar_video(**job)
+
+
+async def generation_worker():
+    """
+    Single consumer for generation_queue
+    Drains up to MAX_BATCH_SIZE already-queued text-only jobs with the
+    same frame count into one packed batch; everything else (reference
+    images, mismatched shapes, subprocess fallback) runs one at a time
+    """
+    held_back: deque = deque()
+
+    while True:
+        job = held_back.popleft() if held_back else await generation_queue.get()
+
+        batch = [job]
+        if pipeline_worker.is_ready() and _is_batchable(job):
+            while len(batch) < MAX_BATCH_SIZE:
+                try:
+                    candidate = generation_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if _is_batchable(candidate) and candidate["num_frames"] == job["num_frames"]:
+                    batch.append(candidate)
+                else:
+                    held_back.append(candidate)
+
+        # A job blowing up must never kill the consumer - mark the batch
+        # failed and keep draining, like a dedicated worker process would
+        try:
+            if len(batch) > 1:
+                logger.info(f"Running packed batch of {len(batch)} jobs")
+                await run_generation_batch(batch)
+            else:
+                await generate_avatar_video(**job)
+        except Exception as e:
+            logger.exception(f"Generation worker error: {e}")
+            for failed in batch:
+                update_job_status(failed["job_id"], JobStatus.FAILED, error=str(e))
+
+
 # ============================================
 # API Endpoints
 # ============================================
 
+@app.on_event("startup")
+async def start_generation_worker():
+    """Start the single generation-queue consumer"""
+    global _loop
+    _loop = asyncio.get_running_loop()
+    # All asyncio.to_thread work (upload saves, deletes, directory scans)
+    # shares this pool; size it explicitly rather than relying on the
+    # CPU-count-derived default
+    _loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=int(os.getenv("THREAD_POOL_SIZE", "32")),
+        thread_name_prefix="io"
+    ))
+    asyncio.create_task(generation_worker())
+    if redis_client is not None:
+        asyncio.create_task(_job_flusher())
+
+
+@app.on_event("shutdown")
+async def flush_job_store():
+    """Push any still-dirty job records before the process exits"""
+    await _flush_dirty_jobs()
+
+
+@app.on_event("startup")
+async def load_resident_pipeline():
+    """
+    Preload the LTX-2 pipeline once so jobs skip the per-subprocess model
+    reload. Loads in a worker thread - the API serves /health immediately
+    and jobs fall back to the subprocess path until loading finishes.
+    """
+    if os.getenv("LTX2_RESIDENT_PIPELINE", "1") == "1":
+        asyncio.create_task(asyncio.to_thread(
+            pipeline_worker.load_pipeline,
+            CHECKPOINT_PATH,
+            GEMMA_ROOT,
+            UPSCALER_PATH,
+            DISTILLED_LORA
+        ))
+
+
 @app.get("/")
 async def root():
     return {
@@ -314,6 +886,7 @@ async def root():
             "health": "/health",
             "generate": "/generate (POST with multipart form)",
             "status": "/status/{job_id}",
+            "status_events": "/status/{job_id}/events (SSE)",
             "download": "/download/{job_id}"
         }
     }
@@ -323,15 +896,14 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "ltx2_available": Path(CHECKPOINT_PATH).exists(),
-        "gemma_available": Path(GEMMA_ROOT).exists(),
+        "ltx2_available": _path_available(CHECKPOINT_PATH),
+        "gemma_available": _path_available(GEMMA_ROOT),
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
 @app.post("/generate", response_model=GenerateResponse)
 async def generate(
-    background_tasks: BackgroundTasks,
     text: str = Form(..., description="Text for the avatar to speak"),
     language: str = Form("English", description="Language for speech"),
     resolution: str = Form("512", description="Base resolution (512 or 768)"),
@@ -354,17 +926,21 @@ async def generate(
     
     Supports multipart/form-data for image upload
     """
-    
+
+    # Reject out-of-range durations up front instead of silently
+    # truncating to 30s after the upload has already been saved
+    if not 5 <= duration <= 30:
+        raise HTTPException(status_code=422, detail="duration must be between 5 and 30 seconds")
+
     # Generate unique job ID
-    job_id = str(uuid.uuid4())
+    job_id = next(_job_ids)
     
     # Handle image upload or trained profile
     image_path = None
     
     if use_trained_profile and trained_person_name:
         # Load first training photo from avatar_clean folder
-        ltx2_path = Path(LTX2_DIR)
-        avatar_folder = ltx2_path / "avatar_clean"
+        avatar_folder = _LTX2_PATH / "avatar_clean"
         
         if avatar_folder.exists():
             training_photos = list(avatar_folder.glob("training_*.png")) + list(avatar_folder.glob("training_*.jpg"))
@@ -378,20 +954,81 @@ async def generate(
             logger.warning(f"Avatar folder not found for trained profile {trained_person_name}")
     
     elif image:
+        # Validate before any bytes hit disk
+        if image.size and image.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+        if image.content_type and image.content_type not in ALLOWED_IMAGE_TYPES:
+            raise HTTPException(status_code=415, detail=f"Unsupported image type: {image.content_type}")
+
         # Regular image upload
         image_ext = Path(image.filename).suffix
         image_path = str(TEMP_PATH / f"{job_id}_avatar{image_ext}")
-        
-        # Save uploaded image
-        with open(image_path, "wb") as f:
-            content = await image.read()
-            f.write(content)
-        
+
+        # Save uploaded image off the event loop
+        await asyncio.to_thread(_save_upload, image.file, image_path)
+
         logger.info(f"Saved uploaded image to {image_path}")
     
-    # Calculate num_frames (6 fps * duration)
-    num_frames = min(duration * 6, 181)  # Cap at 30 seconds
-    
+    # Calculate num_frames (6 fps * duration), aligned for the VAE
+    num_frames = align_num_frames(duration * 6)
+
+    # Content-addressed dedup: reuse a completed twin's output, or
+    # piggyback on an identical in-flight job instead of re-running
+    prompt_preview = build_prompt(
+        text, language, image_path, random_avatar,
+        avatar_description, avatar_gender, avatar_age,
+        avatar_ethnicity, avatar_style
+    )
+    # Hashing reads the whole reference image - keep it off the loop
+    job_hash = await asyncio.to_thread(
+        compute_job_hash,
+        prompt_preview, 42, resolution, num_frames,
+        image_path, image_strength, playback_speed, fresh_start_mode
+    )
+
+    parent_id = _hash_to_job.get(job_hash)
+    if parent_id:
+        parent_video = OUTPUT_PATH / f"{parent_id}.mp4"
+        parent_job = jobs_db.get(parent_id)
+        parent_status = parent_job.get("status") if parent_job else None
+
+        if parent_video.exists() and parent_status in (None, JobStatus.COMPLETED.value):
+            # May fall back to a full video copy across filesystems
+            await asyncio.to_thread(_link_or_copy, parent_video, OUTPUT_PATH / f"{job_id}.mp4")
+            update_job_status(
+                job_id,
+                JobStatus.COMPLETED,
+                progress=100.0,
+                video_url=f"/download/{job_id}",
+                text=text,
+                language=language
+            )
+            logger.info(f"Job {job_id} deduplicated against completed job {parent_id}")
+            return GenerateResponse(
+                job_id=job_id,
+                status=JobStatus.COMPLETED,
+                message="Identical video already generated - reusing output",
+                video_url=f"/download/{job_id}"
+            )
+
+        if parent_status in (JobStatus.QUEUED.value, JobStatus.PROCESSING.value):
+            update_job_status(
+                job_id,
+                JobStatus.QUEUED,
+                progress=0.0,
+                text=text,
+                language=language,
+                parent_job_id=parent_id
+            )
+            logger.info(f"Job {job_id} coalesced with in-flight job {parent_id}")
+            return GenerateResponse(
+                job_id=job_id,
+                status=JobStatus.QUEUED,
+                message="Identical job already in flight - coalesced"
+            )
+
+    _hash_to_job[job_hash] = job_id
+
     # Initialize job
     update_job_status(
         job_id,
@@ -401,9 +1038,8 @@ async def generate(
         language=language
     )
     
-    # Start background generation
-    background_tasks.add_task(
-        generate_avatar_video,
+    # Hand off to the generation worker (packs compatible jobs into batches)
+    generation_queue.put_nowait(dict(
         job_id=job_id,
         text=text,
         language=language,
@@ -419,8 +1055,8 @@ async def generate(
         avatar_ethnicity=avatar_ethnicity,
         avatar_style=avatar_style,
         fresh_start_mode=fresh_start_mode
-    )
-    
+    ))
+
     return GenerateResponse(
         job_id=job_id,
         status=JobStatus.QUEUED,
@@ -428,11 +1064,58 @@ async def generate(
     )
 
 
+@app.post("/generate-batch")
+async def generate_batch(items: List[BatchGenerateItem]):
+    """
+    Queue multiple text-only generations in one request
+    Jobs with the same frame count get packed into one pipeline forward pass
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one item")
+
+    jobs = []
+    for item in items:
+        job_id = next(_job_ids)
+        num_frames = align_num_frames(item.duration * 6)
+
+        update_job_status(
+            job_id,
+            JobStatus.QUEUED,
+            progress=0.0,
+            text=item.text,
+            language=item.language
+        )
+
+        generation_queue.put_nowait(dict(
+            job_id=job_id,
+            text=item.text,
+            language=item.language,
+            image_path=None,
+            resolution="512",
+            num_frames=num_frames,
+            playback_speed=item.playback_speed,
+            image_strength=1.0,
+            random_avatar=item.random_avatar,
+            avatar_description=item.avatar_description,
+            avatar_gender=item.avatar_gender,
+            avatar_age=item.avatar_age,
+            avatar_ethnicity=item.avatar_ethnicity,
+            avatar_style=item.avatar_style,
+            fresh_start_mode=False
+        ))
+
+        jobs.append({"job_id": job_id, "status": JobStatus.QUEUED.value})
+
+    return {"jobs": jobs, "total": len(jobs)}
+
+
 @app.get("/status/{job_id}", response_model=StatusResponse)
 async def get_status(job_id: str):
     """Get job status"""
     
-    if job_id not in jobs_db:
+    job = await _load_job(job_id)
+
+    if job is None:
         # Check if video exists (fallback)
         video_path = OUTPUT_PATH / f"{job_id}.mp4"
         if video_path.exists():
@@ -443,8 +1126,21 @@ async def get_status(job_id: str):
                 video_url=f"/download/{job_id}"
             )
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    job = jobs_db[job_id]
+
+    # Coalesced jobs track their parent's progress until it finishes
+    parent_id = job.get("parent_job_id")
+    if parent_id and job.get("status") not in TERMINAL_STATUSES:
+        job = await _settle_coalesced(job_id, job)
+        if job.get("status") not in TERMINAL_STATUSES:
+            parent = await _load_job(parent_id)
+            if parent is not None:
+                # Mirror the parent's live progress under this job_id
+                return StatusResponse(
+                    job_id=job_id,
+                    status=JobStatus(parent["status"]),
+                    progress=parent.get("progress", 0.0)
+                )
+
     return StatusResponse(
         job_id=job_id,
         status=JobStatus(job["status"]),
@@ -454,37 +1150,285 @@ async def get_status(job_id: str):
     )
 
 
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value}
+
+
+async def _settle_coalesced(job_id: str, job: dict) -> dict:
+    """Advance a coalesced child to its parent's terminal state
+
+    Children piggybacking on an in-flight twin receive no updates of
+    their own; once the parent has finished, materialize the child's
+    output link and terminal record. Returns the (possibly updated)
+    job record
+    """
+    parent_id = job.get("parent_job_id")
+    if not parent_id or job.get("status") in TERMINAL_STATUSES:
+        return job
+
+    parent = await _load_job(parent_id)
+    parent_status = parent.get("status") if parent else None
+    parent_video = OUTPUT_PATH / f"{parent_id}.mp4"
+
+    if parent_status == JobStatus.COMPLETED.value or (parent is None and parent_video.exists()):
+        await asyncio.to_thread(_link_or_copy, parent_video, OUTPUT_PATH / f"{job_id}.mp4")
+        update_job_status(
+            job_id,
+            JobStatus.COMPLETED,
+            progress=100.0,
+            video_url=f"/download/{job_id}"
+        )
+        return jobs_db[job_id]
+    if parent_status == JobStatus.FAILED.value:
+        update_job_status(
+            job_id,
+            JobStatus.FAILED,
+            error=parent.get("error", "Parent job failed")
+        )
+        return jobs_db[job_id]
+    return job
+
+
+async def job_event_stream(job_id: str):
+    """Yield SSE events for a job until it reaches a terminal status
+
+    Backed by Redis pub/sub when configured; otherwise polls the local
+    jobs_db internally so clients still get push-style updates
+
+    Coalesced children have no update path of their own, so the stream
+    watches the parent's record/channel, re-emits its progress under
+    the child's id, and settles the child when the parent terminates
+    """
+    def fmt(record: dict) -> str:
+        return f"data: {orjson.dumps(record).decode()}\n\n"
+
+    def child_stub() -> dict:
+        return jobs_db.get(job_id) or {"job_id": job_id, "parent_job_id": parent_id}
+
+    # One-shot snapshot so late subscribers get current state immediately
+    parent_id = None
+    job = await _load_job(job_id)
+    if job is not None:
+        job = await _settle_coalesced(job_id, job)
+        yield fmt(job)
+        if job.get("status") in TERMINAL_STATUSES:
+            return
+        parent_id = job.get("parent_job_id")
+
+    watch_id = parent_id or job_id
+
+    if redis_client is not None:
+        pubsub = redis_client.pubsub()
+        await pubsub.subscribe(f"progress:{watch_id}")
+        try:
+            # Re-read after subscribing: the write-behind flusher may
+            # have published the terminal event between the snapshot
+            # above and the subscribe, and pub/sub won't replay it
+            job = await _load_job(watch_id)
+            if job is not None and job.get("status") in TERMINAL_STATUSES:
+                if parent_id:
+                    job = await _settle_coalesced(job_id, child_stub())
+                yield fmt(job)
+                return
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                record = orjson.loads(message["data"])
+                if parent_id:
+                    if record.get("status") in TERMINAL_STATUSES:
+                        record = await _settle_coalesced(job_id, child_stub())
+                    else:
+                        record = {**record, "job_id": job_id}
+                yield fmt(record)
+                if record.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            await pubsub.unsubscribe(f"progress:{watch_id}")
+            await pubsub.close()
+    else:
+        last = None
+        while True:
+            job = jobs_db.get(watch_id)
+            if job is not None:
+                snapshot = (job.get("status"), job.get("progress"))
+                if snapshot != last:
+                    last = snapshot
+                    record = job
+                    if parent_id:
+                        if job.get("status") in TERMINAL_STATUSES:
+                            record = await _settle_coalesced(job_id, child_stub())
+                        else:
+                            record = {**job, "job_id": job_id}
+                    yield fmt(record)
+                if job.get("status") in TERMINAL_STATUSES:
+                    return
+            elif (OUTPUT_PATH / f"{watch_id}.mp4").exists():
+                # Watched record evicted (TTL, restart) but its output
+                # exists - finish with a completed event rather than
+                # polling a record that will never come back
+                if parent_id:
+                    record = await _settle_coalesced(job_id, child_stub())
+                else:
+                    record = {
+                        "job_id": job_id,
+                        "status": JobStatus.COMPLETED.value,
+                        "progress": 100.0,
+                        "video_url": f"/download/{job_id}"
+                    }
+                yield fmt(record)
+                return
+            await asyncio.sleep(0.5)
+
+
+@app.get("/status/{job_id}/events")
+async def stream_status(job_id: str):
+    """Stream job progress as server-sent events (push instead of polling)"""
+
+    if job_id not in jobs_db and await _load_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+async def stream_video_file(video_path: Path, start: int = 0, length: Optional[int] = None, chunk_size: int = 1 << 20):
+    """Stream a video file (or a byte range of it) in 1 MiB chunks
+    without blocking the event loop"""
+    async with aiofiles.open(video_path, "rb") as f:
+        if start:
+            await f.seek(start)
+        remaining = length
+        while True:
+            read_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            if read_size <= 0:
+                break
+            chunk = await f.read(read_size)
+            if not chunk:
+                break
+            yield chunk
+            if remaining is not None:
+                remaining -= len(chunk)
+
+
 @app.get("/download/{job_id}")
-async def download_video(job_id: str):
+async def download_video(job_id: str, request: Request):
     """Download generated video"""
-    
+
     video_path = OUTPUT_PATH / f"{job_id}.mp4"
-    
+
     if not video_path.exists():
         raise HTTPException(status_code=404, detail="Video not found")
-    
-    return FileResponse(
-        video_path,
+
+    # Zero-copy path: let nginx sendfile the video straight to the socket
+    # (range handling included - nginx honors Range on accel redirects)
+    if NGINX_ACCEL_PREFIX:
+        return Response(
+            headers={
+                "X-Accel-Redirect": f"{NGINX_ACCEL_PREFIX.rstrip('/')}/{job_id}.mp4",
+                "Content-Type": "video/mp4",
+                "Content-Disposition": f'attachment; filename="avatar_{job_id}.mp4"'
+            }
+        )
+
+    file_size = video_path.stat().st_size
+
+    # Byte-range requests let players seek without pulling the whole file
+    range_header = request.headers.get("range")
+    if range_header and range_header.startswith("bytes="):
+        try:
+            start_s, _, end_s = range_header[6:].partition("-")
+            if not start_s:
+                # Suffix range (bytes=-N): the last N bytes of the file
+                start = max(file_size - int(end_s), 0)
+                end = file_size - 1
+            else:
+                start = int(start_s)
+                end = int(end_s) if end_s else file_size - 1
+        except ValueError:
+            raise HTTPException(status_code=416, detail="Malformed Range header")
+        if start >= file_size or end < start:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+        end = min(end, file_size - 1)
+        length = end - start + 1
+        return StreamingResponse(
+            stream_video_file(video_path, start=start, length=length),
+            status_code=206,
+            media_type="video/mp4",
+            headers={
+                "Content-Range": f"bytes {start}-{end}/{file_size}",
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(length),
+                "Content-Disposition": f'attachment; filename="avatar_{job_id}.mp4"'
+            }
+        )
+
+    return StreamingResponse(
+        stream_video_file(video_path),
         media_type="video/mp4",
-        filename=f"avatar_{job_id}.mp4"
+        headers={
+            "Content-Disposition": f'attachment; filename="avatar_{job_id}.mp4"',
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(file_size)
+        }
     )
 
 
 @app.get("/list")
 async def list_videos(limit: int = 50):
     """List all generated videos"""
-    
+    videos = await asyncio.to_thread(_scan_videos, limit)
+    return {"videos": videos, "total": len(videos)}
+
+
+def _scan_videos(limit: int) -> list:
+    """Directory scan for /list - runs in the shared thread pool"""
+    # os.scandir caches stat results on each DirEntry - one syscall per
+    # file instead of three separate Path.stat() calls
+    with os.scandir(OUTPUT_PATH) as it:
+        entries = [(e.name, e.stat()) for e in it if e.name.endswith(".mp4") and e.is_file()]
+    entries.sort(key=lambda t: t[1].st_ctime, reverse=True)
+
     videos = []
-    for file in sorted(OUTPUT_PATH.glob("*.mp4"), key=lambda x: x.stat().st_ctime, reverse=True)[:limit]:
+    for name, st in entries[:limit]:
+        job_id = name[:-4]
         videos.append({
-            "job_id": file.stem,
-            "filename": file.name,
-            "size": file.stat().st_size,
-            "created": datetime.fromtimestamp(file.stat().st_ctime).isoformat(),
-            "url": f"/download/{file.stem}"
+            "job_id": job_id,
+            "filename": name,
+            "size": st.st_size,
+            "created": datetime.fromtimestamp(st.st_ctime).isoformat(),
+            "url": f"/download/{job_id}"
         })
-    
-    return {"videos": videos, "total": len(videos)}
+    return videos
+
+
+def _collect_clean_targets() -> list:
+    """Gather (path, label) pairs for /clean-workspace - runs in the
+    shared thread pool
+
+    One scandir pass classifies every entry by name instead of a
+    directory read per reference folder plus one per glob pattern
+    """
+    ref_names = set(_REF_FOLDER_NAMES)
+    test_prefixes = ("test_", "demo_", "natasha_", "maya_")
+
+    targets = []
+    if _LTX2_PATH.exists():
+        with os.scandir(_LTX2_PATH) as it:
+            for entry in it:
+                # Reference image folders that might cause mixing
+                if entry.is_dir() and entry.name in ref_names:
+                    targets.append((Path(entry.path), "folder"))
+                # Cached/test videos from the LTX-2 directory
+                elif entry.is_file() and entry.name.endswith(".mp4") and (
+                    entry.name.startswith(test_prefixes) or entry.name == "output.mp4"
+                ):
+                    targets.append((Path(entry.path), "video"))
+
+    # Temp uploaded images
+    targets.extend((temp_file, "temp") for temp_file in TEMP_PATH.glob("*_avatar.*"))
+    return targets
 
 
 @app.post("/clean-workspace")
@@ -494,40 +1438,18 @@ async def clean_workspace():
     Removes old reference images and cached data for a fresh start
     """
     try:
-        ltx2_path = Path(LTX2_DIR)
-        cleaned_items = []
-        
-        # Remove reference image folders that might cause mixing
-        ref_folders = [
-            "natasha_refs",
-            "natasha_single",
-            "avatar_clean",
-            "reference_images",
-            "refs"
-        ]
-        
-        for folder_name in ref_folders:
-            folder_path = ltx2_path / folder_name
-            if folder_path.exists():
-                shutil.rmtree(folder_path)
-                cleaned_items.append(f"Removed folder: {folder_name}")
-        
-        # Remove cached/test videos from LTX-2 directory
-        test_patterns = ["test_*.mp4", "demo_*.mp4", "natasha_*.mp4", "maya_*.mp4", "output.mp4"]
-        for pattern in test_patterns:
-            for file in ltx2_path.glob(pattern):
-                file.unlink()
-                cleaned_items.append(f"Removed video: {file.name}")
-        
-        # Clear temp uploaded images
-        for temp_file in TEMP_PATH.glob("*_avatar.*"):
-            temp_file.unlink()
-            cleaned_items.append(f"Removed temp: {temp_file.name}")
-        
+        # Collect targets off the event loop, then delete in parallel so
+        # it isn't pinned behind globs or serial rmtree calls
+        targets = await asyncio.to_thread(_collect_clean_targets)
+
+        cleaned_items = list(await asyncio.gather(
+            *(asyncio.to_thread(_safe_delete, path, label) for path, label in targets)
+        ))
+
         # Create fresh avatar folder
-        avatar_folder = ltx2_path / "avatar_clean"
-        avatar_folder.mkdir(parents=True, exist_ok=True)
-        
+        avatar_folder = _LTX2_PATH / "avatar_clean"
+        await asyncio.to_thread(avatar_folder.mkdir, parents=True, exist_ok=True)
+
         logger.info(f"Workspace cleaned: {len(cleaned_items)} items removed")
         
         return {
@@ -550,36 +1472,52 @@ async def workspace_status():
     Shows how many reference images and cached videos exist
     """
     try:
-        ltx2_path = Path(LTX2_DIR)
-        
-        # Count reference images
-        ref_count = 0
-        ref_folders = ["natasha_refs", "natasha_single", "avatar_clean", "reference_images", "refs"]
-        for folder_name in ref_folders:
-            folder_path = ltx2_path / folder_name
-            if folder_path.exists():
-                ref_count += len(list(folder_path.glob("*.png"))) + len(list(folder_path.glob("*.jpg")))
-        
-        # Count cached videos in LTX-2 dir
-        cached_videos = len(list(ltx2_path.glob("*.mp4")))
-        
-        # Count temp files
-        temp_files = len(list(TEMP_PATH.glob("*")))
-        
-        return {
-            "status": "healthy",
-            "reference_images": ref_count,
-            "cached_videos": cached_videos,
-            "temp_files": temp_files,
-            "output_videos": len(list(OUTPUT_PATH.glob("*.mp4"))),
-            "recommendation": "Clean workspace if reference_images > 1 to prevent face mixing"
-        }
-        
+        return await asyncio.to_thread(_scan_workspace_cached, int(time.monotonic()))
     except Exception as e:
         logger.error(f"Failed to get workspace status: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
 
 
+@lru_cache(maxsize=1)
+def _scan_workspace_cached(time_bucket: int) -> dict:
+    """Directory counts for /workspace-status - runs in the shared
+    thread pool
+
+    Keyed on a 1s time bucket: a polling frontend gets at most one
+    filesystem sweep per second no matter how many clients ask
+    """
+    # Count reference images (one directory scan per folder instead
+    # of separate globs per extension)
+    ref_count = 0
+    for folder_path in _REF_FOLDERS:
+        if folder_path.exists():
+            with os.scandir(folder_path) as it:
+                ref_count += sum(1 for e in it if e.name.endswith((".png", ".jpg")))
+
+    # Count cached videos in LTX-2 dir (which may not exist on a box
+    # where the model tree hasn't been set up yet)
+    cached_videos = 0
+    if _LTX2_PATH.exists():
+        with os.scandir(_LTX2_PATH) as it:
+            cached_videos = sum(1 for e in it if e.name.endswith(".mp4"))
+
+    # Count temp files
+    with os.scandir(TEMP_PATH) as it:
+        temp_files = sum(1 for _ in it)
+
+    with os.scandir(OUTPUT_PATH) as it:
+        output_videos = sum(1 for e in it if e.name.endswith(".mp4"))
+
+    return {
+        "status": "healthy",
+        "reference_images": ref_count,
+        "cached_videos": cached_videos,
+        "temp_files": temp_files,
+        "output_videos": output_videos,
+        "recommendation": "Clean workspace if reference_images > 1 to prevent face mixing"
+    }
+
+
 async def simulate_training_progress(
     training_job_id: str,
     training_log_path: Path,
@@ -599,26 +1537,23 @@ async def simulate_training_progress(
             progress = (step / training_steps) * 100
             
             # Update training log
-            with open(training_log_path, 'r') as f:
-                training_data = json.load(f)
-            
+            training_data = read_json(training_log_path)
+
             training_data.update({
                 "current_step": step,
                 "progress": progress,
                 "current_accuracy": 60 + (progress * 0.325),  # Gradually increase from 60% to 92.5%
                 "epochs_completed": step
             })
-            
-            with open(training_log_path, 'w') as f:
-                json.dump(training_data, f, indent=2)
+
+            write_training_log(training_log_path, training_data)
             
             # Simulate processing time
             await asyncio.sleep(time_per_step * (training_steps // 20))
         
         # Mark as completed
-        with open(training_log_path, 'r') as f:
-            training_data = json.load(f)
-        
+        training_data = read_json(training_log_path)
+
         training_data.update({
             "status": "completed",
             "completed_at": datetime.utcnow().isoformat(),
@@ -628,24 +1563,21 @@ async def simulate_training_progress(
             "epochs_completed": training_steps,
             "recommendation": f"Training complete! Use Face Consistency Strength 1.8-2.0 with {person_name}'s photos for maximum accuracy."
         })
-        
-        with open(training_log_path, 'w') as f:
-            json.dump(training_data, f, indent=2)
-        
+
+        write_training_log(training_log_path, training_data)
+
         logger.info(f"Training completed for job {training_job_id}")
         
     except Exception as e:
         logger.error(f"Training simulation failed for {training_job_id}: {e}")
         # Mark as failed
         try:
-            with open(training_log_path, 'r') as f:
-                training_data = json.load(f)
+            training_data = read_json(training_log_path)
             training_data.update({
                 "status": "failed",
                 "error": str(e)
             })
-            with open(training_log_path, 'w') as f:
-                json.dump(training_data, f, indent=2)
+            write_training_log(training_log_path, training_data)
         except:
             pass
 
@@ -670,9 +1602,8 @@ async def training_progress(job_id: str):
         if not training_log_path.exists():
             raise HTTPException(status_code=404, detail="Training job not found")
         
-        with open(training_log_path, 'r') as f:
-            training_data = json.load(f)
-        
+        training_data = read_json(training_log_path)
+
         return {
             "job_id": job_id,
             "status": training_data.get("status", "training"),
@@ -692,6 +1623,37 @@ async def training_progress(job_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get progress: {str(e)}")
 
 
+def _load_latest_training_log():
+    """Return the newest training log - runs in the shared thread pool
+
+    The SQLite index answers in one indexed lookup; the mtime-cached
+    directory scan below only covers logs written before the index
+    existed
+    """
+    try:
+        with _training_db_lock:
+            row = _training_db().execute(
+                "SELECT json FROM training_runs ORDER BY mtime DESC LIMIT 1"
+            ).fetchone()
+        if row:
+            return orjson.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Training index lookup failed: {e}")
+
+    training_logs_dir = BASE_DIR / "outputs" / "training_logs"
+    training_logs_dir.mkdir(parents=True, exist_ok=True)
+
+    # Rescan only when the directory mtime moved - the hot path is a
+    # single stat instead of N stats plus a sort per poll
+    dir_mtime = os.stat(training_logs_dir).st_mtime
+    if dir_mtime != _training_log_cache["dir_mtime"]:
+        training_logs = sorted(training_logs_dir.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+        _training_log_cache["data"] = read_json(training_logs[0]) if training_logs else None
+        _training_log_cache["dir_mtime"] = dir_mtime
+
+    return _training_log_cache["data"]
+
+
 @app.get("/training-status")
 async def training_status():
     """
@@ -699,23 +1661,14 @@ async def training_status():
     Shows accuracy, training steps, and recommendations
     """
     try:
-        training_logs_dir = BASE_DIR / "outputs" / "training_logs"
-        training_logs_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Find the most recent training log
-        training_logs = sorted(training_logs_dir.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
-        
-        if not training_logs:
+        training_data = await asyncio.to_thread(_load_latest_training_log)
+
+        if training_data is None:
             return {
                 "has_training": False,
                 "message": "No training profile found"
             }
         
-        # Load most recent training data
-        latest_log = training_logs[0]
-        with open(latest_log, 'r') as f:
-            training_data = json.load(f)
-        
         return {
             "has_training": True,
             "person_name": training_data.get("person_name", "Unknown"),
@@ -755,27 +1708,41 @@ async def train_face(
             raise HTTPException(status_code=400, detail="Upload at least 3 photos for training")
         if len(training_photos) > 10:
             raise HTTPException(status_code=400, detail="Maximum 10 photos allowed")
-        
-        ltx2_path = Path(LTX2_DIR)
-        avatar_folder = ltx2_path / "avatar_clean"
+
+        # Validate every photo before touching disk - a bad upload must
+        # not clear the existing profile or leave partial files behind
+        for photo in training_photos:
+            if photo.size and photo.size > MAX_PHOTO_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Photo {photo.filename} exceeds {MAX_PHOTO_BYTES // (1024 * 1024)} MB limit"
+                )
+            if photo.content_type and photo.content_type not in ALLOWED_IMAGE_TYPES:
+                raise HTTPException(
+                    status_code=415,
+                    detail=f"Unsupported photo type for {photo.filename}: {photo.content_type}"
+                )
+
+        avatar_folder = _LTX2_PATH / "avatar_clean"
         avatar_folder.mkdir(parents=True, exist_ok=True)
-        
+
         # Clear existing photos
         for old_photo in avatar_folder.glob("*"):
             old_photo.unlink()
-        
-        # Save uploaded training photos
-        photo_files = []
-        for idx, photo in enumerate(training_photos):
+
+        # Save uploaded training photos concurrently - the writes overlap
+        # with each other and with the network receive, so the stage takes
+        # roughly as long as the largest photo instead of the sum
+        async def save_one(idx: int, photo: UploadFile) -> Path:
             photo_ext = Path(photo.filename).suffix
             photo_path = avatar_folder / f"training_{idx}{photo_ext}"
-            
-            with open(photo_path, "wb") as f:
-                content = await photo.read()
-                f.write(content)
-            
-            photo_files.append(photo_path)
+            await _stream_upload(photo, photo_path)
             logger.info(f"Saved training photo: {photo_path}")
+            return photo_path
+
+        photo_files = list(await asyncio.gather(
+            *(save_one(idx, photo) for idx, photo in enumerate(training_photos))
+        ))
         
         logger.info(f"Uploaded {len(photo_files)} training photos for {person_name}")
         
@@ -796,9 +1763,8 @@ async def train_face(
             "epochs_completed": 0
         }
         
-        with open(training_log_path, 'w') as f:
-            json.dump(training_data, f, indent=2)
-        
+        write_training_log(training_log_path, training_data)
+
         # Simulate training progress (in real implementation, this would call the training script)
         # For now, we'll mark it as complete with high accuracy since we're using strong image conditioning
         training_data.update({
@@ -809,9 +1775,8 @@ async def train_face(
             "recommendation": f"Training complete! Use Face Consistency Strength 1.8-2.0 with {person_name}'s photos for maximum accuracy."
         })
         
-        with open(training_log_path, 'w') as f:
-            json.dump(training_data, f, indent=2)
-        
+        write_training_log(training_log_path, training_data)
+
         # Generate training job ID
         training_job_id = f"train_{person_name}_{int(datetime.utcnow().timestamp())}"
         
@@ -890,6 +1855,14 @@ async def master_reset():
                 deleted_items.append(f"Training folder: {folder_name}")
         
         # 4. Delete ALL training logs, profiles, and metadata
+        # Close the SQLite index first: rmtree unlinks index.db, and an
+        # open connection would keep serving (and writing) the stale
+        # unlinked inode. The next _training_db() call recreates it fresh
+        global _training_db_conn
+        with _training_db_lock:
+            if _training_db_conn is not None:
+                _training_db_conn.close()
+                _training_db_conn = None
         training_logs_dir = BASE_DIR / "outputs" / "training_logs"
         if training_logs_dir.exists():
             shutil.rmtree(training_logs_dir)
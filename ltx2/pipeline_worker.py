@@ -0,0 +1,441 @@
+"""
+SFitz911 Avatar Generator - Resident LTX-2 Pipeline Worker
+Loads the TI2VidTwoStagesPipeline once and reuses it across jobs,
+instead of reloading tens of GB of weights in a subprocess per request
+"""
+
+import os
+import threading
+from contextlib import nullcontext
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+# The API server runs inside the LTX-2 venv, so ltx_pipelines is normally
+# importable in-process. If it isn't (dev box, partial install), the server
+# keeps using the subprocess path.
+try:
+    import torch
+    from ltx_pipelines.ti2vid_two_stages import TI2VidTwoStagesPipeline
+    from ltx_pipelines.utils import (
+        LTXV_LORA_COMFY_RENAMING_MAP,
+        LoraPathStrengthAndSDOps,
+        encode_video,
+    )
+    PIPELINE_AVAILABLE = True
+except ImportError as e:
+    PIPELINE_AVAILABLE = False
+    _import_error = e
+
+# Resident pipeline (loaded once via load_pipeline)
+PIPELINE = None
+
+# One generation at a time - the pipeline owns the whole GPU
+_generate_lock = threading.Lock()
+
+# (height, width, num_frames) combinations warmed up after compile; any
+# other shape still works but pays a torch.compile recompilation
+COMPILED_SHAPES = [(512, 512, 121), (512, 512, 177), (768, 768, 121)]
+
+# Dedicated stream for conditioning-image H2D copies
+_copy_stream = None
+
+
+class TensorPool:
+    """Reusable buffers keyed by (shape, dtype) to avoid re-allocation
+
+    Pinned host allocations (cudaHostAlloc) and repeated GPU buffers are
+    expensive to create per job; with generation serialized by
+    _generate_lock a single cached buffer per shape is enough
+    """
+
+    def __init__(self, pin_memory: bool = False):
+        self._pin_memory = pin_memory
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, shape, dtype):
+        key = (tuple(shape), dtype)
+        with self._lock:
+            buf = self._cache.get(key)
+            if buf is None:
+                buf = torch.empty(key[0], dtype=dtype, pin_memory=self._pin_memory)
+                self._cache[key] = buf
+            return buf
+
+
+# Pinned staging buffers for conditioning-image uploads; avatar photos
+# share a handful of shapes, so the pool stays tiny
+_pinned_pool = TensorPool(pin_memory=True)
+
+
+def _preload_image(image_path: str):
+    """Decode the conditioning image into pinned host memory and copy it
+    to the GPU with a non-blocking transfer on a side stream
+
+    Returns the GPU tensor, or None when decode/copy isn't possible
+    (no CUDA, no torchvision) - callers then pass the path through and
+    let the pipeline do its own loading
+
+    Opt-in via LTX2_PINNED_IMAGE=1: the pipeline's own loader owns the
+    normalization of path inputs, and handing it raw 0-255 values as
+    fp16 would silently change the conditioning. Off until the tensor
+    input contract (layout and value range) is verified against it
+    """
+    global _copy_stream
+    if os.getenv("LTX2_PINNED_IMAGE", "0") != "1":
+        return None
+    if not torch.cuda.is_available():
+        return None
+    try:
+        from torchvision.io import read_image
+
+        decoded = read_image(image_path)
+        img = _pinned_pool.get(decoded.shape, torch.float16)
+        img.copy_(decoded)
+        if _copy_stream is None:
+            _copy_stream = torch.cuda.Stream()
+        with torch.cuda.stream(_copy_stream):
+            img_gpu = img.to("cuda", non_blocking=True)
+        # The tensor is handed to the black-box pipeline right after, so
+        # sync here; pinned + async still beats a pageable blocking copy
+        torch.cuda.current_stream().wait_stream(_copy_stream)
+        return img_gpu
+    except Exception as e:
+        logger.debug(f"Pinned image preload unavailable: {e}")
+        return None
+
+
+# Set to the transformer_engine module when FP8 linears are active, so
+# forwards run under te.fp8_autocast
+_te = None
+
+
+def _fp8_ctx():
+    """Context manager for forwards: fp8_autocast when TE linears are in"""
+    if _te is not None:
+        return _te.fp8_autocast(enabled=True)
+    return nullcontext()
+
+
+def _quantize_linears():
+    """Swap large transformer linears for TransformerEngine FP8 Linears
+
+    Opt-in via LTX2_TE_FP8=1 (Hopper-class GPUs); anything that fails
+    leaves the stock FP16/BF16 layers in place
+    """
+    global _te
+    if os.getenv("LTX2_TE_FP8", "0") != "1":
+        return
+    try:
+        import transformer_engine.pytorch as te
+    except ImportError:
+        logger.info("transformer_engine not installed - keeping stock linears")
+        return
+
+    transformer = getattr(PIPELINE, "transformer", None)
+    if transformer is None or not hasattr(transformer, "named_modules"):
+        return
+
+    try:
+        replaced = 0
+        for _, module in transformer.named_modules():
+            for child_name, child in list(module.named_children()):
+                if isinstance(child, torch.nn.Linear) and child.out_features >= 1024:
+                    te_linear = te.Linear(
+                        child.in_features,
+                        child.out_features,
+                        bias=child.bias is not None,
+                        params_dtype=torch.bfloat16
+                    )
+                    with torch.no_grad():
+                        te_linear.weight.copy_(child.weight)
+                        if child.bias is not None:
+                            te_linear.bias.copy_(child.bias)
+                    setattr(module, child_name, te_linear)
+                    replaced += 1
+
+        if replaced:
+            _te = te
+            logger.info(f"Replaced {replaced} linears with TransformerEngine FP8 layers")
+    except Exception as e:
+        _te = None
+        logger.warning(f"FP8 linear swap failed, keeping stock layers: {e}")
+
+
+def _apply_optimizations():
+    """Apply torch.compile and SageAttention to the loaded pipeline
+
+    Both are best-effort and env-gated: a failure falls back to the
+    stock eager pipeline rather than taking generation down
+    """
+    if os.getenv("LTX2_SAGE_ATTENTION", "1") == "1":
+        try:
+            from sageattention import sageattn
+
+            # Route SDPA through SageAttention's INT8 kernels where the
+            # call shape allows it; anything else falls through to stock
+            _orig_sdpa = torch.nn.functional.scaled_dot_product_attention
+
+            def _sdpa(q, k, v, attn_mask=None, dropout_p=0.0, is_causal=False, **kwargs):
+                if attn_mask is None and dropout_p == 0.0 and q.dtype in (torch.float16, torch.bfloat16):
+                    return sageattn(q, k, v, is_causal=is_causal)
+                return _orig_sdpa(q, k, v, attn_mask=attn_mask, dropout_p=dropout_p, is_causal=is_causal, **kwargs)
+
+            torch.nn.functional.scaled_dot_product_attention = _sdpa
+            logger.info("SageAttention enabled for attention kernels")
+        except ImportError:
+            logger.info("sageattention not installed - keeping stock SDPA")
+
+    if os.getenv("LTX2_TORCH_COMPILE", "1") == "1":
+        try:
+            if hasattr(PIPELINE, "transformer"):
+                PIPELINE.transformer = torch.compile(
+                    PIPELINE.transformer, mode="reduce-overhead", fullgraph=False, dynamic=False
+                )
+            if hasattr(PIPELINE, "vae") and hasattr(PIPELINE.vae, "decoder"):
+                PIPELINE.vae.decoder = torch.compile(
+                    PIPELINE.vae.decoder, mode="reduce-overhead", fullgraph=False, dynamic=False
+                )
+            logger.info("torch.compile applied to transformer and VAE decoder")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, running eager: {e}")
+
+
+def _tensor_safe_key(args, kwargs):
+    """Build a hashable cache key, mapping tensors to (shape, dtype, device)
+
+    Only valid for modules whose output is fully determined by the input
+    shape (rotary position grids). Timestep embeddings are NOT - their
+    inputs change value every denoising step at a constant shape.
+    """
+    def keyify(v):
+        if torch.is_tensor(v):
+            return ("tensor", tuple(v.shape), v.dtype, str(v.device))
+        return v
+
+    key = (tuple(keyify(a) for a in args),
+           tuple((k, keyify(v)) for k, v in sorted(kwargs.items())))
+    hash(key)  # raises TypeError for anything still unhashable
+    return key
+
+
+def _install_embedding_caches():
+    """Memoize per-shape constant embeddings recomputed on every forward
+
+    Rotary position embeddings depend only on the latent
+    shape/dtype/device, yet get rebuilt O(steps x layers) times per job.
+    Modules are matched by class name so an upstream rename degrades to
+    stock behavior instead of crashing.
+    """
+    transformer = getattr(PIPELINE, "transformer", None)
+    if transformer is None or not hasattr(transformer, "named_modules"):
+        return
+
+    patched = 0
+    for _, module in transformer.named_modules():
+        type_name = type(module).__name__
+        if "RotaryPosEmbed" in type_name and not hasattr(module, "_shape_cache"):
+            module._shape_cache = {}
+            orig_forward = module.forward
+
+            def cached_forward(*args, _orig=orig_forward, _mod=module, **kwargs):
+                try:
+                    key = _tensor_safe_key(args, kwargs)
+                except TypeError:
+                    return _orig(*args, **kwargs)
+                out = _mod._shape_cache.get(key)
+                if out is None:
+                    out = _orig(*args, **kwargs)
+                    _mod._shape_cache[key] = out
+                return out
+
+            module.forward = cached_forward
+            patched += 1
+
+    if patched:
+        logger.info(f"Embedding caches installed on {patched} module(s)")
+
+
+def _warmup():
+    """Run one dummy forward per known shape so the first real request
+    doesn't pay the compile cost (opt-in - each pass runs the full model)"""
+    for height, width, num_frames in COMPILED_SHAPES:
+        try:
+            logger.info(f"Warming up pipeline for shape ({height}, {width}, {num_frames})...")
+            with torch.no_grad(), _fp8_ctx():
+                PIPELINE(
+                    prompt="A person speaking",
+                    height=height,
+                    width=width,
+                    num_frames=num_frames,
+                    seed=0,
+                    images=[]
+                )
+        except Exception as e:
+            logger.warning(f"Warmup failed for shape ({height}, {width}, {num_frames}): {e}")
+            break
+
+
+def is_ready() -> bool:
+    """True once the resident pipeline has finished loading"""
+    return PIPELINE is not None
+
+
+def load_pipeline(
+    checkpoint_path: str,
+    gemma_root: str,
+    upscaler_path: str,
+    distilled_lora: str
+) -> bool:
+    """
+    Load the LTX-2 pipeline once (blocking, tens of seconds)
+    Returns True when the in-process path is ready, False on fallback
+    """
+    global PIPELINE
+
+    if not PIPELINE_AVAILABLE:
+        logger.warning(f"ltx_pipelines not importable ({_import_error}) - using subprocess generation")
+        return False
+
+    if PIPELINE is not None:
+        return True
+
+    try:
+        # Expandable segments let the caching allocator grow mappings in
+        # place instead of fragmenting and re-cudaMalloc'ing under
+        # back-to-back jobs; must be set before the first CUDA allocation
+        os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+        # Multi-GPU hosts run one API server per GPU (LTX2_DEVICE=0,1,...)
+        # rather than sharding one model - tensor parallelism would need
+        # the parallel linears inside the upstream transformer blocks
+        if torch.cuda.is_available():
+            device_index = int(os.getenv("LTX2_DEVICE", "0"))
+            if device_index:
+                torch.cuda.set_device(device_index)
+                logger.info(f"Pinned resident pipeline to CUDA device {device_index}")
+
+        logger.info("Loading resident LTX-2 pipeline (one-time cost)...")
+        with torch.no_grad():
+            PIPELINE = TI2VidTwoStagesPipeline(
+                checkpoint_path=checkpoint_path,
+                gemma_root=gemma_root,
+                spatial_upsampler_path=upscaler_path,
+                distilled_lora=[
+                    LoraPathStrengthAndSDOps(
+                        path=distilled_lora,
+                        strength=1.0,
+                        sd_ops=LTXV_LORA_COMFY_RENAMING_MAP
+                    )
+                ]
+            )
+        _quantize_linears()
+        _apply_optimizations()
+        _install_embedding_caches()
+
+        if os.getenv("LTX2_COMPILE_WARMUP", "0") == "1":
+            _warmup()
+
+        logger.info("Resident LTX-2 pipeline ready - jobs now skip model reload")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to load resident pipeline, using subprocess fallback: {e}")
+        PIPELINE = None
+        return False
+
+
+def generate(
+    prompt: str,
+    output_path: str,
+    num_frames: int,
+    height: int = 512,
+    width: int = 512,
+    seed: int = 42,
+    image_path: Optional[str] = None,
+    image_strength: float = 1.0,
+    progress_callback: Optional[Callable[[float], None]] = None
+):
+    """
+    Run one generation on the resident pipeline (blocking; call from a
+    worker thread). Maps diffusion step index to a 40-95% progress range.
+    """
+    if PIPELINE is None:
+        raise RuntimeError("Resident pipeline not loaded")
+
+    images = []
+    img_gpu = None
+    if image_path:
+        # (image, frame index, conditioning strength) - same as the CLI
+        # --image flag; prefer a pre-staged GPU tensor over the raw path
+        img_gpu = _preload_image(image_path)
+        images = [(img_gpu if img_gpu is not None else image_path, 0, image_strength)]
+
+    def on_step_end(step: int, total_steps: int):
+        if progress_callback and total_steps:
+            progress_callback(40.0 + 55.0 * (step + 1) / total_steps)
+
+    with _generate_lock:
+        with torch.no_grad(), _fp8_ctx():
+            try:
+                video, audio = PIPELINE(
+                    prompt=prompt,
+                    height=height,
+                    width=width,
+                    num_frames=num_frames,
+                    seed=seed,
+                    images=images,
+                    callback_on_step_end=on_step_end
+                )
+            except (TypeError, ValueError):
+                if img_gpu is None:
+                    raise
+                # Pipeline wants a path, not a tensor - retry the stock way
+                images = [(image_path, 0, image_strength)]
+                video, audio = PIPELINE(
+                    prompt=prompt,
+                    height=height,
+                    width=width,
+                    num_frames=num_frames,
+                    seed=seed,
+                    images=images,
+                    callback_on_step_end=on_step_end
+                )
+
+        encode_video(video, audio, str(output_path))
+
+
+def generate_batch(
+    prompts: List[str],
+    output_paths: List[str],
+    num_frames: int,
+    height: int = 512,
+    width: int = 512,
+    seed: int = 42,
+    progress_callback: Optional[Callable[[float], None]] = None
+):
+    """
+    Run a packed batch of text-only generations in one forward pass
+    All samples share (height, width, num_frames) so latents stack cleanly
+    """
+    if PIPELINE is None:
+        raise RuntimeError("Resident pipeline not loaded")
+
+    def on_step_end(step: int, total_steps: int):
+        if progress_callback and total_steps:
+            progress_callback(40.0 + 55.0 * (step + 1) / total_steps)
+
+    with _generate_lock:
+        with torch.no_grad(), _fp8_ctx():
+            videos, audios = PIPELINE(
+                prompt=list(prompts),
+                height=height,
+                width=width,
+                num_frames=num_frames,
+                seed=seed,
+                images=[],
+                callback_on_step_end=on_step_end
+            )
+
+        for video, audio, path in zip(videos, audios, output_paths):
+            encode_video(video, audio, str(path))
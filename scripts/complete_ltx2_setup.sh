@@ -79,7 +79,7 @@ echo "🔧 Step 4: Installing API and Frontend dependencies..."
 cd /workspace/LTX-2
 
 # Use UV to install in the LTX-2 venv (not pip!)
-uv pip install fastapi uvicorn loguru python-multipart streamlit requests pillow
+uv pip install fastapi uvicorn loguru python-multipart aiofiles orjson cachetools streamlit requests pillow
 
 echo "✅ All Python dependencies installed"
 